@@ -58,10 +58,14 @@ class LogGenerator:
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.59': 0.05
         }
 
-    def weighted_choice(self, choices_dict):
-        """Make a weighted random choice from a dictionary of choices and weights."""
+    def weighted_choices(self, choices_dict, k):
+        """Make k weighted random choices from a dictionary of choices and weights.
+
+        One random.choices call draws the whole batch, so the cumulative
+        weights are only computed once instead of once per entry.
+        """
         choices, weights = zip(*choices_dict.items())
-        return random.choices(choices, weights=weights, k=1)[0]
+        return random.choices(choices, weights=weights, k=k)
 
     def generate_response_time(self):
         """Generate a realistic response time with long tail distribution."""
@@ -93,21 +97,18 @@ class LogGenerator:
             ])
         return fake.ipv4()
 
-    def generate_log_entry(self, timestamp):
-        """Generate a single log entry."""
-        method = self.weighted_choice(self.methods)
-        endpoint = self.weighted_choice(self.endpoints)
-        status_code = self.weighted_choice(self.status_codes)
-        
+    def generate_log_entry(self, timestamp, method, endpoint, status_code,
+                           user_agent):
+        """Generate a single log entry from pre-drawn weighted fields."""
         # Generate referrer (30% chance of having a referrer)
         referrer = fake.uri() if random.random() < 0.3 else "-"
-        
+
         return (
             f'{self.generate_ip()} - - '
             f'[{timestamp.strftime("%d/%b/%Y:%H:%M:%S")} +0000] '
             f'"{method} {endpoint} HTTP/1.1" '
             f'{status_code} {self.generate_bytes_sent()} '
-            f'"{referrer}" "{self.weighted_choice(self.user_agents)}" '
+            f'"{referrer}" "{user_agent}" '
             f'{self.generate_response_time()}\n'
         )
 
@@ -121,35 +122,44 @@ class LogGenerator:
         end_time = datetime.now()
         start_time = end_time - timedelta(days=7)  # Generate last 7 days of logs
         
-        timestamps = []
-        # Create timestamps with higher frequency during business hours
-        current_time = start_time
-        while current_time < end_time:
-            hour = current_time.hour
-            # More frequent logs during business hours (8am-6pm)
-            if 8 <= hour <= 18:
-                num_entries = np.random.poisson(5)  # Average 5 entries per minute
-            else:
-                num_entries = np.random.poisson(1)  # Average 1 entry per minute
-            
-            for _ in range(num_entries):
-                # Add some random seconds
-                random_seconds = random.random() * 60
-                timestamps.append(current_time + timedelta(seconds=random_seconds))
-            
-            current_time += timedelta(minutes=1)
-        
-        # Sort timestamps and take the required number
-        timestamps.sort()
-        if len(timestamps) > num_lines:
-            timestamps = random.sample(timestamps, num_lines)
-        timestamps.sort()  # Resort after sampling
+        # Create timestamps with higher frequency during business hours,
+        # drawing all the per-minute Poisson counts in one vectorized call
+        total_minutes = int((end_time - start_time).total_seconds() // 60)
+        minute_index = np.arange(total_minutes)
+        hours = ((start_time.hour * 60 + start_time.minute + minute_index) // 60) % 24
+        # More frequent logs during business hours (8am-6pm)
+        rates = np.where((hours >= 8) & (hours <= 18), 5, 1)
+        counts = np.random.poisson(rates)
+
+        # One entry per count, at a random second within its minute
+        offsets = np.repeat(minute_index, counts) * 60.0
+        offsets += np.random.random(offsets.size) * 60
+        offsets.sort()
+
+        # Take the required number by picking sorted positions, which
+        # keeps the already-sorted order without a second sort of
+        # datetime objects
+        if offsets.size > num_lines:
+            keep = np.random.choice(offsets.size, num_lines, replace=False)
+            keep.sort()
+            offsets = offsets[keep]
+        timestamps = [start_time + timedelta(seconds=s) for s in offsets]
         
-        # Write log entries
+        # Draw the weighted fields for all entries in one batch each
+        num_entries = len(timestamps)
+        methods = self.weighted_choices(self.methods, num_entries)
+        endpoints = self.weighted_choices(self.endpoints, num_entries)
+        status_codes = self.weighted_choices(self.status_codes, num_entries)
+        agents = self.weighted_choices(self.user_agents, num_entries)
+
+        # Format all entries, then write them in one call; a single
+        # join-and-write is much cheaper than one f.write per line
+        lines = [self.generate_log_entry(*entry)
+                 for entry in zip(timestamps, methods, endpoints,
+                                  status_codes, agents)]
         output_path = output_dir / output_file
         with open(output_path, 'w') as f:
-            for timestamp in timestamps:
-                f.write(self.generate_log_entry(timestamp))
+            f.write(''.join(lines))
         
         print(f"Generated {num_lines} log entries in {output_path}")
 